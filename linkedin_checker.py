@@ -9,25 +9,31 @@ Version: 14.2 (The Account Management Build - Bugfix 2)
 """
 
 # --- Core Libraries ---
+import functools
+import heapq
+import itertools
 import json
 import logging
 import queue
 import random
 import re
+import shutil
 import sys
+import tempfile
 import threading
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from dataclasses import asdict, dataclass, field
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from enum import Enum, auto
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
 
 # --- Dynamic Dependency Imports ---
 try:
     from selenium import webdriver
-    from selenium.common.exceptions import TimeoutException, WebDriverException
+    from selenium.common.exceptions import StaleElementReferenceException, TimeoutException, WebDriverException
     from selenium.webdriver.chrome.options import Options as ChromeOptions
     from selenium.webdriver.chrome.service import Service as ChromeService
     from selenium.webdriver.common.by import By
@@ -52,6 +58,12 @@ try:
 except ImportError:
     SELENIUM_STEALTH_AVAILABLE = False
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 try:
     from bs4 import BeautifulSoup
     BS4_AVAILABLE = True
@@ -80,6 +92,30 @@ SESSIONS_DIR = APP_PATH / "sessions"
 STATE_FILE = APP_PATH / "checker.state"
 DEFAULT_INPUT_FILE = str(APP_PATH / "linkedin_links.txt")
 DEFAULT_OUTPUT_DIR = str(APP_PATH / "results")
+LINK_URL_PATTERN = re.compile(r'https?://(?:www\.)?linkedin\.com/[^\s\'"<>(),;]+')
+UNSAFE_FILENAME_CHARS = re.compile(r'[^\w\-_\.]')
+LINKEDIN_ORIGIN = "https://www.linkedin.com" # Origin whose storage is wiped before a pooled browser changes accounts
+# Trim per-browser memory and background work; only page text is ever read from these browsers
+CHROME_LEAN_ARGS = (
+    '--disable-background-timer-throttling', '--disable-renderer-backgrounding', '--disable-extensions', '--disable-sync',
+    '--disable-features=TranslateUI,BlinkGenPropertyTrees', '--disk-cache-size=0', '--aggressive-cache-discard',
+    '--js-flags=--max-old-space-size=1024',
+)
+BLOCKED_RESOURCE_URLS = ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico", "*.woff", "*.woff2", "*.ttf", "*.otf", "*.mp4", "*.webm", "*.mp3"]
+SESSION_DEAD_PATTERN = re.compile(r'no such window|invalid session id|target window already closed', re.I)
+BROWSER_POOL_RECYCLE_AFTER = 100 # Quit and replace a pooled browser after this many checkouts
+ACCOUNT_MIN_INTERVAL = 2.0 # Minimum seconds between two link checks on the same account, whichever worker holds it
+WORKER_START_STAGGER = 0.1 # Seconds between worker start-ups so the first requests don't land together
+WAIT_POLL_FREQUENCY = 0.1 # Seconds between WebDriverWait polls (Selenium default is 0.5)
+STATE_FLUSH_INTERVAL = 0.25 # Seconds the state writer waits to batch processed links before the next write
+GUI_REFRESH_INTERVAL = 0.2 # Minimum seconds between stats refreshes pushed to the GUI
+GUI_FLUSH_INTERVAL_MS = 100 # Delay before one coalesced redraw of the status/stats updates posted by worker threads
+LOG_QUEUE_MAX = 10000 # Log lines buffered for the GUI before new ones are dropped
+LOG_DRAIN_DELAY_MS = 50 # After a log line arrives, wait this long so a burst lands in one textbox insert
+LOG_WATCHDOG_MS = 1000 # Fallback drain interval in case a scheduled drain was missed
+LOG_MAX_LINES = 5000 # Older lines are trimmed from the GUI log so Tk's layout cost doesn't grow with the run
+LOG_TRIM_TO_LINES = 4000 # A trim keeps this many, so trims happen in chunks rather than on every batch
+PAGE_SOURCE_SCAN_LIMIT = 256 * 1024 # Characters of page_source, from <body> on, classified when innerText isn't available
 
 
 # --- Enums for Status Tracking ---
@@ -100,13 +136,27 @@ class LinkStatus(Enum):
     ERROR = "ERROR"
 
 
+# Marker categories in the order classify_content checks them: (category, status, reason)
+MARKER_RULES = (
+    ("rate_limit", LinkStatus.RATE_LIMIT, "Rate limit / CAPTCHA on link page."),
+    ("already_premium", LinkStatus.FAILED, "Account is already a Premium member."),
+    ("invalid", LinkStatus.FAILED, "Offer unavailable/expired."),
+    ("valid", LinkStatus.WORKING, "Potential trial/gift offer found."),
+)
+# Stats counter bumped for each link status; anything not listed counts as failed/invalid
+STATUS_STAT_FIELDS = {LinkStatus.WORKING: "working_found", LinkStatus.RATE_LIMIT: "link_captcha_failures", LinkStatus.ERROR: "errors"}
+STATS_LABEL_FIELDS = (('processed', "Processed", "total_processed"), ('working', "Working", "working_found"), ('failed', "Failed", "failed_or_invalid"),
+                      ('rate_limit', "Rate Limit", "link_captcha_failures"), ('login_fails', "Login Fails", "login_failures"), ('errors', "Errors", "errors")) # GUI label key, caption, Stats field
+
+
 # --- Default Configuration ---
 DEFAULT_CONFIG = {
     "settings": {
         "input_file": DEFAULT_INPUT_FILE, "output_dir": DEFAULT_OUTPUT_DIR,
         "delay_min": 3.0, "delay_max": 7.0, "headless": True, "language": "en",
         "theme": "dark", "color_theme": "blue", "num_threads": 2, "window_geometry": "1200x800",
-        "account_rest_duration_minutes": 30, "page_load_timeout": 60,
+        "account_rest_duration_minutes": 30, "page_load_timeout": 60, "block_heavy_resources": True,
+        "humanize_typing": False,
     },
     "accounts_text": "", # Storing raw text to avoid the previous TypeError
     "selectors": {
@@ -146,7 +196,7 @@ class Account:
         if not self.last_rate_limited_at: return False
         is_resting = datetime.now() < self.last_rate_limited_at + timedelta(minutes=duration_minutes)
         if is_resting:
-             main_logger.debug(f"Account {self.email} is resting.")
+             main_logger.debug("Account %s is resting.", self.email)
         return is_resting
 
 @dataclass
@@ -159,18 +209,27 @@ class Stats:
 
 
 # --- Logger & Config Setup ---
+class NotifyingQueue(queue.Queue):
+    """Queue that calls on_put after every successful put, so a consumer can react to new items instead of polling."""
+    def __init__(self, maxsize: int = 0): super().__init__(maxsize); self.on_put: Optional[Callable[[], None]] = None
+    def put(self, item: Any, block: bool = True, timeout: Optional[float] = None):
+        super().put(item, block, timeout)
+        if self.on_put: self.on_put()
+
 class QueueHandler(logging.Handler):
     def __init__(self, log_queue: queue.Queue): super().__init__(); self.log_queue = log_queue
-    def emit(self, record: logging.LogRecord): self.log_queue.put(self.format(record))
+    def emit(self, record: logging.LogRecord):
+        try: self.log_queue.put_nowait(self.format(record))
+        except queue.Full: pass # GUI is behind; drop the line rather than block a worker (the log file still has it)
 
 def setup_logging(log_level: int = logging.INFO, log_queue: Optional[queue.Queue] = None) -> logging.Logger:
     LOG_DIR.mkdir(parents=True, exist_ok=True)
     log_format = '%(asctime)s | %(levelname)-8s | %(threadName)-15s | %(message)s'
     formatter = logging.Formatter(log_format, datefmt='%Y-%m-%d %H:%M:%S')
-    logging.basicConfig(level=logging.CRITICAL, format=log_format, force=True)
+    logging.getLogger().setLevel(logging.CRITICAL) # Silence selenium/urllib3 chatter without installing a root handler
     logger = logging.getLogger("LinkedInChecker")
     logger.setLevel(log_level)
-    if logger.hasHandlers(): logger.handlers.clear()
+    for handler in logger.handlers[:]: logger.removeHandler(handler); handler.close() # Re-setup (GUI start) must not leak the old log file
     logger.propagate = False
     stream_handler = logging.StreamHandler(sys.stdout); stream_handler.setFormatter(formatter); logger.addHandler(stream_handler)
     try:
@@ -217,35 +276,60 @@ class ToolTip(ctk.CTkToplevel):
 
 
 # --- WebDriver Manager ---
+@functools.lru_cache(maxsize=1)
+def _chrome_driver_path() -> str: return ChromeDriverManager().install()
+
 class DriverManager:
     """Handles creating WebDriver instances with advanced stealth."""
+    _driver_path_lock = threading.Lock() # Keeps concurrent first callers from racing the install
+
     def __init__(self, config: Dict[str, Any]):
         self.config = config; self.settings = config['settings']; self.headless = self.settings.get('headless', True)
         self.user_agents = self.config.get('user_agents', []); SESSIONS_DIR.mkdir(exist_ok=True)
+        self.cache_dirs: Dict[int, str] = {}; self._cache_dirs_lock = threading.Lock() # id(driver) -> its private disk cache dir
 
     def _get_cookie_path(self, email: str) -> Path:
-        sanitized_email = re.sub(r'[^\w\-_\.]', '_', email); return SESSIONS_DIR / f"{sanitized_email}.json"
+        sanitized_email = UNSAFE_FILENAME_CHARS.sub('_', email); return SESSIONS_DIR / f"{sanitized_email}.json"
     def save_cookies(self, driver: WebDriver, email: str):
         try:
-            cookies = driver.get_cookies()
-            with self._get_cookie_path(email).open('w') as f: json.dump(cookies, f)
+            cookies = driver.get_cookies(); cookie_path = self._get_cookie_path(email)
+            if ORJSON_AVAILABLE: cookie_path.write_bytes(orjson.dumps(cookies))
+            else:
+                with cookie_path.open('w') as f: json.dump(cookies, f)
             main_logger.debug(f"Saved session cookies for {email}.")
         except Exception as e: main_logger.error(f"Failed to save cookies for {email}: {e}")
+    def _set_cookies_via_cdp(self, driver: WebDriver, cookies: List[Dict[str, Any]]) -> bool:
+        """Injects all cookies in one CDP call (Chromium only), without having to navigate to the domain first."""
+        if not hasattr(driver, 'execute_cdp_cmd'): return False
+        cdp_cookies = []
+        for cookie in cookies:
+            cdp_cookie = {k: cookie[k] for k in ('name', 'value', 'domain', 'path', 'secure', 'httpOnly', 'sameSite') if cookie.get(k) is not None}
+            if cookie.get('expiry') is not None: cdp_cookie['expires'] = int(cookie['expiry'])
+            cdp_cookies.append(cdp_cookie)
+        try: driver.execute_cdp_cmd('Network.setCookies', {'cookies': cdp_cookies}); return True
+        except Exception as e: main_logger.debug(f"CDP cookie injection failed, falling back to add_cookie: {e}"); return False
     def load_cookies(self, driver: WebDriver, email: str) -> bool:
         cookie_path = self._get_cookie_path(email)
         if not cookie_path.exists(): return False
         try:
-            with cookie_path.open('r') as f: cookies = json.load(f)
-            driver.get("https://www.linkedin.com/") # Domain must be visited first
-            for cookie in cookies:
-                try:
-                    if 'expiry' in cookie and cookie['expiry'] is not None: cookie['expiry'] = int(cookie['expiry'])
-                    driver.add_cookie(cookie)
-                except Exception: continue
+            if ORJSON_AVAILABLE: cookies = orjson.loads(cookie_path.read_bytes())
+            else:
+                with cookie_path.open('r') as f: cookies = json.load(f)
+            if not self._set_cookies_via_cdp(driver, cookies):
+                driver.get("https://www.linkedin.com/robots.txt") # Domain must be visited first; robots.txt is the cheapest page on it
+                for cookie in cookies:
+                    try:
+                        if 'expiry' in cookie and cookie['expiry'] is not None: cookie['expiry'] = int(cookie['expiry'])
+                        driver.add_cookie(cookie)
+                    except Exception: continue
             main_logger.info(f"Loaded {len(cookies)} session cookies for {email}.")
             return True
         except Exception as e: main_logger.error(f"Failed to load cookies for {email}: {e}"); return False
 
+    @classmethod
+    def _get_driver_path(cls) -> str:
+        with cls._driver_path_lock: return _chrome_driver_path()
+
     def create_driver(self) -> WebDriver:
         user_agent = random.choice(self.user_agents) if self.user_agents else ""
         options = ChromeOptions()
@@ -255,38 +339,191 @@ class DriverManager:
         options.add_argument('--start-maximized')
         options.add_argument('--disable-blink-features=AutomationControlled')
         options.add_experimental_option('useAutomationExtension', False)
+        options.page_load_strategy = 'eager' # Return once the DOM is parsed; trackers and media keep loading in the background
+        for arg in CHROME_LEAN_ARGS: options.add_argument(arg)
+        cache_dir = tempfile.mkdtemp(prefix='lic_cache_'); options.add_argument(f'--disk-cache-dir={cache_dir}')
         
         # BUGFIX: Removed experimental options that crash newer versions of chromedriver.
-        # The undetected_chromedriver library handles these internally now.
-        # prefs = {"profile.default_content_setting_values.notifications": 2, "profile.default_content_settings.popups": 0, "profile.managed_default_content_settings.images": 2}
-        # options.add_experimental_option("prefs", prefs)
+        # The undetected_chromedriver library handles these internally now, so prefs are only set for plain chromedriver.
+        if self.settings.get('block_heavy_resources', True):
+            # Only page text is classified, so skip downloading images.
+            options.add_argument('--blink-settings=imagesEnabled=false')
+            if not UNDETECTED_CHROME_AVAILABLE: options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
         
         if user_agent: options.add_argument(f"user-agent={user_agent}")
         if self.headless: options.add_argument("--headless=new")
-        if UNDETECTED_CHROME_AVAILABLE:
-            main_logger.info("Using undetected-chromedriver for enhanced stealth.")
-            driver = uc.Chrome(options=options, use_subprocess=True)
-        else:
-            main_logger.info("Using standard chromedriver.")
-            service = ChromeService(ChromeDriverManager().install()); driver = webdriver.Chrome(service=service, options=options)
-        if not UNDETECTED_CHROME_AVAILABLE and SELENIUM_STEALTH_AVAILABLE:
-            main_logger.info("Applying selenium-stealth patches.")
-            stealth(driver, languages=["en-US", "en"], vendor="Google Inc.", platform="Win32", webgl_vendor="Intel Inc.", renderer="Intel Iris OpenGL Engine", fix_hairline=True)
-        timeout = self.settings.get('page_load_timeout', 60); driver.set_page_load_timeout(timeout)
+        try:
+            if UNDETECTED_CHROME_AVAILABLE:
+                main_logger.info("Using undetected-chromedriver for enhanced stealth.")
+                driver = uc.Chrome(options=options, use_subprocess=True)
+            else:
+                main_logger.info("Using standard chromedriver.")
+                service = ChromeService(self._get_driver_path()); driver = webdriver.Chrome(service=service, options=options)
+        except Exception: shutil.rmtree(cache_dir, ignore_errors=True); raise
+        with self._cache_dirs_lock: self.cache_dirs[id(driver)] = cache_dir
+        try:
+            if not UNDETECTED_CHROME_AVAILABLE and SELENIUM_STEALTH_AVAILABLE:
+                main_logger.info("Applying selenium-stealth patches.")
+                stealth(driver, languages=["en-US", "en"], vendor="Google Inc.", platform="Win32", webgl_vendor="Intel Inc.", renderer="Intel Iris OpenGL Engine", fix_hairline=True)
+            timeout = self.settings.get('page_load_timeout', 60); driver.set_page_load_timeout(timeout)
+            if self.settings.get('block_heavy_resources', True):
+                # Also drop fonts, media and CSS-referenced images at the network layer. Stylesheets stay: element visibility checks depend on them.
+                try: driver.execute_cdp_cmd('Network.enable', {}); driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': BLOCKED_RESOURCE_URLS})
+                except Exception as e: main_logger.warning(f"Could not block heavy resources via CDP: {e}")
+        except Exception: # The pool never saw this browser, so nothing else would quit it or remove its cache dir
+            try: driver.quit()
+            except Exception: pass
+            self.remove_cache_dir(driver); raise
         return driver
 
+    def remove_cache_dir(self, driver: WebDriver):
+        """Deletes a quit driver's private disk cache directory."""
+        with self._cache_dirs_lock: cache_dir = self.cache_dirs.pop(id(driver), None)
+        if cache_dir: shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+# --- WebDriver Pool ---
+class WebDriverPool:
+    """Keeps pre-warmed browsers so account logins don't pay the browser startup cost each time, and parks
+    logged-in browsers by account so an account that comes back skips the cookie replay and login entirely."""
+    def __init__(self, driver_manager: DriverManager, size: int, recycle_after: int = BROWSER_POOL_RECYCLE_AFTER):
+        self.driver_manager = driver_manager; self.size = max(1, size); self.recycle_after = recycle_after
+        self.idle_drivers: queue.Queue = queue.Queue(); self.uses_per_driver: Dict[int, int] = {}
+        self.all_drivers: Dict[int, WebDriver] = {}; self.lock = threading.Lock()
+        self.sessions: Dict[str, WebDriver] = {} # Parked logged-in browsers by account email, oldest first
+
+    def _spawn(self) -> WebDriver:
+        driver = self.driver_manager.create_driver()
+        with self.lock: self.all_drivers[id(driver)] = driver; self.uses_per_driver[id(driver)] = 0
+        return driver
+    def warm_up(self):
+        missing = self.size - len(self.all_drivers)
+        if missing <= 0: return
+        with ThreadPoolExecutor(max_workers=missing, thread_name_prefix="DriverWarmup") as executor:
+            futures = [executor.submit(self._spawn) for _ in range(missing)]
+            for future in as_completed(futures):
+                try: self.idle_drivers.put(future.result())
+                except Exception as e: main_logger.error(f"Failed to pre-warm a browser: {e}")
+        main_logger.info(f"Browser pool ready with {self.idle_drivers.qsize()} pre-warmed drivers.")
+
+    def acquire(self) -> WebDriver:
+        try: driver = self.idle_drivers.get_nowait()
+        except queue.Empty: driver = self._steal_session() or self._spawn()
+        with self.lock: self.uses_per_driver[id(driver)] = self.uses_per_driver.get(id(driver), 0) + 1
+        return driver
+    def acquire_session(self, account_email: str) -> Optional[WebDriver]:
+        """Returns the browser still logged in as this account, if one is parked and its browser still answers."""
+        with self.lock:
+            driver = self.sessions.pop(account_email, None)
+            if driver: self.uses_per_driver[id(driver)] = self.uses_per_driver.get(id(driver), 0) + 1
+        if driver is None: return None
+        try:
+            if driver.session_id and driver.current_url: return driver # One cheap round trip; no navigation
+        except Exception: pass # A dead chromedriver raises urllib3/socket errors, not just WebDriverException
+        main_logger.debug(f"Parked session for {account_email} is dead; logging in again."); self.discard(driver); return None
+    def _steal_session(self) -> Optional[WebDriver]:
+        # At capacity with nothing idle, reuse the longest-parked session rather than growing past the pool size
+        with self.lock:
+            if len(self.all_drivers) < self.size or not self.sessions: return None
+            driver = self.sessions.pop(next(iter(self.sessions)))
+        try: self._clear_session(driver); return driver
+        except Exception: self.discard(driver); return None # A dead chromedriver raises urllib3/socket errors, not just WebDriverException
+    def park(self, driver: WebDriver, account_email: str):
+        with self.lock:
+            if self.uses_per_driver.get(id(driver), 0) < self.recycle_after and account_email not in self.sessions:
+                self.sessions[account_email] = driver; return
+        self.release(driver)
+    def release(self, driver: WebDriver):
+        with self.lock: uses = self.uses_per_driver.get(id(driver), 0)
+        if uses >= self.recycle_after:
+            main_logger.debug(f"Recycling browser after {uses} uses."); self.discard(driver); return
+        try: self._clear_session(driver)
+        except Exception: self.discard(driver); return # Browser is gone (a dead chromedriver raises urllib3/socket errors too), don't hand it out again
+        self.idle_drivers.put(driver)
+    def _clear_session(self, driver: WebDriver):
+        """Logs the browser out of every account before it serves another one; raises if the browser is gone."""
+        try: # delete_all_cookies only reaches the current page's domain and leaves localStorage alone
+            driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+            driver.execute_cdp_cmd('Storage.clearDataForOrigin', {'origin': LINKEDIN_ORIGIN, 'storageTypes': 'all'})
+        except Exception as e: main_logger.debug(f"CDP session wipe failed, falling back to delete_all_cookies: {e}"); driver.delete_all_cookies()
+    def discard(self, driver: WebDriver):
+        with self.lock: self.all_drivers.pop(id(driver), None); self.uses_per_driver.pop(id(driver), None)
+        try: driver.quit()
+        except Exception: pass
+        self.driver_manager.remove_cache_dir(driver)
+    def shutdown(self):
+        with self.lock: drivers = list(self.all_drivers.values()); self.sessions.clear()
+        for driver in drivers: self.discard(driver)
+        while not self.idle_drivers.empty():
+            try: self.idle_drivers.get_nowait()
+            except queue.Empty: break
+
+
+# --- Account Pool ---
+class AccountPool:
+    """Rotates accounts between workers, parking rate-limited ones in a heap until their rest period ends."""
+    def __init__(self, accounts: List[Account], rest_minutes: int):
+        self.rest_minutes = rest_minutes; self.lock = threading.Condition() # Notified whenever an account is returned
+        self.active_accounts: Deque[Account] = deque()
+        self.resting_accounts: List[Tuple[datetime, int, Account]] = [] # Min-heap on rest end time; the counter breaks ties
+        self._sequence = itertools.count()
+        for account in accounts: self.release(account)
+
+    def _wake_rested_accounts(self):
+        now = datetime.now()
+        while self.resting_accounts and self.resting_accounts[0][0] <= now:
+            _, _, account = heapq.heappop(self.resting_accounts); self.active_accounts.append(account)
+            main_logger.debug(f"Account {account.email} finished resting.")
+    def acquire(self, timeout: float = 0) -> Optional[Account]:
+        """Returns an account, waiting up to timeout seconds for one to be released or finish resting; None if none came free."""
+        deadline = time.monotonic() + timeout
+        with self.lock:
+            while True:
+                self._wake_rested_accounts()
+                if self.active_accounts: return self.active_accounts.popleft()
+                remaining = deadline - time.monotonic()
+                if remaining <= 0: return None
+                if self.resting_accounts: remaining = min(remaining, (self.resting_accounts[0][0] - datetime.now()).total_seconds())
+                self.lock.wait(max(remaining, 0.01)) # Until a release, the next rest end, or the deadline
+    def release(self, account: Account):
+        with self.lock:
+            if account.is_resting(self.rest_minutes):
+                rest_until = account.last_rate_limited_at + timedelta(minutes=self.rest_minutes)
+                heapq.heappush(self.resting_accounts, (rest_until, next(self._sequence), account))
+            else: self.active_accounts.append(account)
+            self.lock.notify() # A waiter either takes this account or re-times its wait for the earliest rest end
+    def empty(self) -> bool:
+        with self.lock: return not self.active_accounts and not self.resting_accounts
+
 
 # --- Core Checker Class ---
 class LinkedInChecker:
     def __init__(self, config: Dict[str, Any], accounts: List[Account], gui_instance: Optional['LinkedInCheckerGUI'] = None):
         self.config = config; self.settings = config['settings']; self.accounts = accounts
+        # Settings are fixed for a checker's lifetime (the GUI builds a new one per run), so hot paths read these snapshots
+        self._num_threads = max(1, int(self.settings.get('num_threads', 1))); self._page_load_timeout = self.settings.get('page_load_timeout', 60)
+        self._delay_min = float(self.settings.get('delay_min', 1.0)); self._delay_max = float(self.settings.get('delay_max', 3.0))
+        self._rest_minutes = self.settings.get('account_rest_duration_minutes', 30)
         self.gui = gui_instance; self.driver_manager = DriverManager(self.config)
+        self.driver_pool = WebDriverPool(self.driver_manager, self._num_threads)
         self.should_stop = threading.Event(); self.pause_event = threading.Event(); self.pause_event.set()
-        self.is_paused = False; self.stats = Stats(); self.results: List[LinkResult] = []
+        self.is_paused = False; self.stats = Stats(); self.results: Deque[LinkResult] = deque() # Append-only during a run; no list regrowth copies
         self.links_queue = queue.Queue(); self.processed_links_log = set()
-        self.account_pool = queue.Queue(); [self.account_pool.put(acc) for acc in self.accounts]
+        self._state_write_queue: queue.Queue = queue.Queue(); self._state_writer: Optional[threading.Thread] = None
+        self.results_queue: queue.Queue = queue.Queue(); self._aggregator: Optional[threading.Thread] = None
+        self._working_heap: List[Tuple[str, int, LinkResult]] = [] # Ordered by link as results arrive; the int breaks ties
+        self._results_writer: Optional[threading.Thread] = None
+        self._link_counter = itertools.count(1); self._total_links = 0
+        self._account_last_hit: Dict[str, float] = {} # email -> monotonic time of its last link check; each account has one holder at a time
+        # Shared rate limiter: a refiller thread drips tokens at the configured average pace for all workers combined
+        self._rate_tokens: queue.Queue = queue.Queue(maxsize=self._num_threads)
+        self._rate_refill_stop = threading.Event(); self._rate_refiller: Optional[threading.Thread] = None
+        self.account_pool = AccountPool(self.accounts, self._rest_minutes)
         self.active_threads = 0; self.lock = threading.Lock()
-        main_logger.info(f"Checker initialized with {self.settings.get('num_threads')} threads.")
+        self._selectors = {key: tuple(selectors) for key, selectors in self.config['selectors'].items()}
+        self._locators = {key: self._combine_locators(selectors) for key, selectors in self._selectors.items()}
+        self._markers = {category: tuple(m.lower() for m in markers) for category, markers in self.config['markers'].items()}
+        main_logger.info(f"Checker initialized with {self._num_threads} threads.")
 
     def _load_processed_links_state(self):
         if not STATE_FILE.exists(): return
@@ -295,164 +532,246 @@ class LinkedInChecker:
             if self.processed_links_log: main_logger.info(f"Loaded state file. Skipping {len(self.processed_links_log)} already processed links.")
         except Exception as e: main_logger.error(f"Error loading state file: {e}")
     def _log_processed_link(self, link: str):
-        self.processed_links_log.add(link)
+        self.processed_links_log.add(link); self._state_write_queue.put(link)
+    def _state_writer_loop(self):
+        """Appends processed links to the state file in batches; a None item flushes and stops the writer."""
+        try: state_file = STATE_FILE.open('a', encoding='utf-8', buffering=65536) # One handle for the whole run, flushed per batch
+        except Exception as e: main_logger.error(f"Error opening state file: {e}"); state_file = None
         try:
-            with STATE_FILE.open('a', encoding='utf-8') as f: f.write(f"{link}\n")
-        except Exception as e: main_logger.error(f"Error writing to state file: {e}")
+            while True:
+                batch = [self._state_write_queue.get()]
+                while True:
+                    try: batch.append(self._state_write_queue.get_nowait())
+                    except queue.Empty: break
+                links = [link for link in batch if link is not None]
+                if links and state_file:
+                    try: state_file.write("\n".join(links) + "\n"); state_file.flush()
+                    except Exception as e: main_logger.error(f"Error writing to state file: {e}")
+                if len(links) != len(batch): return
+                time.sleep(STATE_FLUSH_INTERVAL)
+        finally:
+            if state_file: state_file.close()
+    def _start_state_writer(self):
+        self._state_writer = threading.Thread(target=self._state_writer_loop, name="StateWriter", daemon=True); self._state_writer.start()
+    def _stop_state_writer(self):
+        if not self._state_writer: return
+        self._state_write_queue.put(None); self._state_writer.join(); self._state_writer = None
 
     def read_and_queue_links(self) -> int:
         self._load_processed_links_state()
         input_file = Path(self.settings.get('input_file', ''))
         if not input_file.exists(): main_logger.error(f"Input file not found: {str(input_file)}"); return 0
-        unique_links = {}
+        seen_links: Set[str] = set(); processed = self.processed_links_log; find_links = LINK_URL_PATTERN.findall; count = 0
         try:
-            with input_file.open('r', encoding='utf-8', errors='ignore') as f: content = f.read()
-            url_pattern = re.compile(r'https?://(?:www\.)?linkedin\.com/[^\s\'"<>(),;]+')
-            for i, line in enumerate(content.splitlines()):
-                for match in url_pattern.finditer(line):
-                    url = match.group(0).strip(".,;")
-                    if url not in unique_links and url not in self.processed_links_log: unique_links[url] = i + 1
-            for url, line_num in unique_links.items(): self.links_queue.put((url, line_num))
-            count = self.links_queue.qsize()
+            with input_file.open('r', encoding='utf-8', errors='ignore') as f:
+                for i, line in enumerate(f):
+                    if 'linkedin.com' not in line: continue # C-level prefilter; most lines in a mixed list never reach the regex
+                    if self.should_stop.is_set(): break
+                    for url in find_links(line):
+                        url = url.strip(".,;")
+                        if url in seen_links or url in processed: continue
+                        seen_links.add(url); self.links_queue.put((url, i + 1)); count += 1
             main_logger.info(f"{count} unique, unprocessed links found.")
             return count
         except Exception as e: main_logger.error(f"Error reading links file: {str(e)}"); return 0
 
-    def _find_element(self, driver: WebDriver, selectors: List[str], timeout: int = 10) -> Optional[WebElement]:
-        for selector in selectors:
-            try:
-                by = By.XPATH if selector.startswith(("//", "./")) else By.CSS_SELECTOR
-                return WebDriverWait(driver, timeout).until(EC.visibility_of_element_located((by, selector)))
-            except TimeoutException: continue
-        return None
+    @staticmethod
+    def _combine_locators(selectors: Sequence[str]) -> Tuple[Tuple[str, str], ...]:
+        """Folds a selector list into at most two locators: one CSS group and one XPath union."""
+        xpaths = [s for s in selectors if s.startswith(("//", "./"))]; css = [s for s in selectors if not s.startswith(("//", "./"))]
+        locators = []
+        if css: locators.append((By.CSS_SELECTOR, ", ".join(css)))
+        if xpaths: locators.append((By.XPATH, " | ".join(xpaths)))
+        return tuple(locators)
+    def _find_element(self, driver: WebDriver, key: str, timeout: int = 10) -> Optional[WebElement]:
+        # One wait over the key's precombined locators, instead of a full timeout per selector
+        locators = self._locators.get(key, ())
+        if not locators: return None
+        # A combined locator matches many elements; wait for any visible one, not just the first in document order (it may be a hidden placeholder)
+        conditions = [EC.visibility_of_any_elements_located(locator) for locator in locators]
+        condition = conditions[0] if len(conditions) == 1 else EC.any_of(*conditions) # Single-kind groups skip the any_of wrapper
+        try: return WebDriverWait(driver, timeout, poll_frequency=WAIT_POLL_FREQUENCY, ignored_exceptions=(StaleElementReferenceException,)).until(condition)[0]
+        except TimeoutException: return None
     def _type_like_human(self, element: WebElement, text: str):
         for char in text: element.send_keys(char); time.sleep(random.uniform(0.05, 0.15))
+    def _fill_field(self, driver: WebDriver, element: WebElement, text: str):
+        if self.settings.get('humanize_typing', False): self._type_like_human(element, text); return
+        element.click() # Focus, then insert the whole value in one CDP call instead of one WebDriver command per character
+        try: driver.execute_cdp_cmd('Input.insertText', {'text': text})
+        except Exception: element.send_keys(text)
 
     def setup_and_login(self, account: Account) -> Tuple[Optional[WebDriver], LoginStatus]:
         main_logger.info(f"Attempting to start session for {account.email}.")
-        driver = self.driver_manager.create_driver()
+        driver = self.driver_pool.acquire_session(account.email)
+        if driver: main_logger.info(f"SUCCESS: Reusing the open session for {account.email}."); return driver, LoginStatus.SUCCESS
+        driver = self.driver_pool.acquire()
         try:
             if self.driver_manager.load_cookies(driver, account.email):
                 driver.get("https://www.linkedin.com/feed/")
-                if self._find_element(driver, self.config['selectors']['login_success_indicator']):
+                if self._find_element(driver, 'login_success_indicator'):
                     main_logger.info(f"SUCCESS: Resumed session for {account.email} using cookies.")
                     return driver, LoginStatus.SUCCESS
                 main_logger.warning(f"Cookie session for {account.email} is invalid. Performing full login.")
                 driver.delete_all_cookies()
 
             driver.get("https://www.linkedin.com/login")
-            username_field = self._find_element(driver, self.config['selectors']['username_field'])
+            username_field = self._find_element(driver, 'username_field')
             if not username_field: return driver, LoginStatus.FAIL_PAGE_ERROR
-            self._type_like_human(username_field, account.email)
-            password_field = self._find_element(driver, self.config['selectors']['password_field'])
+            self._fill_field(driver, username_field, account.email)
+            password_field = self._find_element(driver, 'password_field')
             if not password_field: return driver, LoginStatus.FAIL_PAGE_ERROR
-            self._type_like_human(password_field, account.password)
-            submit_button = self._find_element(driver, self.config['selectors']['login_submit_button'])
+            self._fill_field(driver, password_field, account.password); time.sleep(random.uniform(0.3, 0.8))
+            submit_button = self._find_element(driver, 'login_submit_button')
             if not submit_button: return driver, LoginStatus.FAIL_PAGE_ERROR
             submit_button.click()
 
             try:
-                WebDriverWait(driver, 45).until(EC.any_of(
-                    EC.presence_of_element_located((By.XPATH, self.config['selectors']['login_success_indicator'][0])),
-                    EC.presence_of_element_located((By.CSS_SELECTOR, self.config['selectors']['login_error_message'][0])),
+                WebDriverWait(driver, 45, poll_frequency=WAIT_POLL_FREQUENCY).until(EC.any_of(
+                    EC.presence_of_element_located((By.XPATH, self._selectors['login_success_indicator'][0])),
+                    EC.presence_of_element_located((By.CSS_SELECTOR, self._selectors['login_error_message'][0])),
                     EC.url_contains("checkpoint"), EC.url_contains("challenge")))
             except TimeoutException: main_logger.error(f"TIMEOUT: Login for {account.email} did not result in a known page state."); return driver, LoginStatus.FAIL_TIMEOUT
 
             current_url = driver.current_url.lower()
-            if self._find_element(driver, self.config['selectors']['login_success_indicator'], 5):
+            if self._find_element(driver, 'login_success_indicator', 5):
                 main_logger.info(f"SUCCESS: Full login successful for {account.email}."); self.driver_manager.save_cookies(driver, account.email); return driver, LoginStatus.SUCCESS
             if "checkpoint" in current_url or "challenge" in current_url:
                 main_logger.warning(f"Security challenge for {account.email}. Pausing for manual intervention.")
                 if self.gui and not self.settings.get('headless'):
-                    if self.gui.show_captcha_prompt(account.email):
-                        if self._find_element(driver, self.config['selectors']['login_success_indicator'], 5):
+                    if self.gui.show_captcha_prompt(account.email).result():
+                        if self._find_element(driver, 'login_success_indicator', 5):
                              main_logger.info(f"Security challenge for {account.email} resolved by user. Resuming."); self.driver_manager.save_cookies(driver, account.email); return driver, LoginStatus.SUCCESS
                 main_logger.error(f"User skipped or failed the security challenge for {account.email}."); return driver, LoginStatus.FAIL_CAPTCHA
-            if self._find_element(driver, self.config['selectors']['login_error_message'], 2):
+            if self._find_element(driver, 'login_error_message', 2):
                 main_logger.warning(f"BAD CREDS: Login failed for {account.email}."); return driver, LoginStatus.FAIL_BAD_CREDS
             main_logger.error(f"UNKNOWN: Login failed for {account.email} with an unknown page state. URL: {current_url}"); return driver, LoginStatus.FAIL_UNKNOWN
         except Exception as e: main_logger.critical(f"CRITICAL: Unhandled exception in login for {account.email}: {e}", exc_info=True); return driver, LoginStatus.FAIL_UNKNOWN
 
-    def classify_content(self, html_content: str, current_url: str) -> Tuple[LinkStatus, str]:
-        if not html_content or not BS4_AVAILABLE: return LinkStatus.ERROR, "Empty or unparsable content"
-        lower_content = html_content.lower(); lower_url = current_url.lower()
-        if any(sub in lower_url for sub in self.config['markers']['login_redirect']): return LinkStatus.SESSION_LOST, "Redirected to login/authwall page."
-        for marker in self.config['markers']['rate_limit']:
-            if marker in lower_content: return LinkStatus.RATE_LIMIT, f"Rate limit / CAPTCHA on link page. Marker: {marker}"
-        for marker in self.config['markers']['already_premium']:
-            if marker in lower_content: return LinkStatus.FAILED, f"Account is already a Premium member. Marker: {marker}"
-        for marker in self.config['markers']['invalid']:
-            if marker in lower_content: return LinkStatus.FAILED, f"Offer unavailable/expired. Marker: {marker}"
-        for marker in self.config['markers']['valid']:
-            if marker in lower_content: return LinkStatus.WORKING, f"Potential trial/gift offer found. Marker: {marker}"
-        if "/feed/" in lower_url and not any(k in lower_url for k in ["premium", "sales", "gift"]): return LinkStatus.FAILED, "Redirected to main feed; link likely invalid or expired."
+    def classify_content(self, lower_content: str, lower_url: str) -> Tuple[LinkStatus, str]:
+        """Classifies a page from its already-lowercased text and URL (the caller lowercases each once)."""
+        if not lower_content or not BS4_AVAILABLE: return LinkStatus.ERROR, "Empty or unparsable content"
+        for category, status, reason in MARKER_RULES:
+            for marker in self._markers.get(category, ()):
+                if marker in lower_content: return status, f"{reason} Marker: {marker}"
+        if "/feed/" in lower_url and not any(k in lower_url for k in ("premium", "sales", "gift")): return LinkStatus.FAILED, "Redirected to main feed; link likely invalid or expired."
         return LinkStatus.FAILED, "No clear trial indicators found; link likely invalid."
 
     def analyze_link_page(self, driver: WebDriver, url: str) -> LinkResult:
         try:
-            main_logger.debug(f"Navigating to {url}"); timeout = self.settings.get('page_load_timeout', 60); driver.get(url)
-            WebDriverWait(driver, timeout).until(lambda d: d.execute_script('return document.readyState') == 'complete')
-            classification, reason = self.classify_content(driver.page_source, driver.current_url)
-            return LinkResult(link=url, status=classification, result_details=reason, final_url=driver.current_url)
+            # With the 'eager' load strategy, get() itself blocks until the DOM is ready (bounded by the driver's page load timeout)
+            main_logger.debug("Navigating to %s", url); timeout = self._page_load_timeout; driver.get(url)
+            final_url = driver.current_url; lower_url = final_url.lower() # A login/authwall redirect is known from the URL alone; don't fetch the page for it
+            if any(sub in lower_url for sub in self._markers.get('login_redirect', ())): return LinkResult(link=url, status=LinkStatus.SESSION_LOST, result_details="Redirected to login/authwall page.", final_url=final_url)
+            # The markers are visible text, so innerText is enough and a fraction of page_source (no markup, scripts or styles)
+            try: page_text = driver.execute_script("return document.body ? document.body.innerText : ''")
+            except WebDriverException: page_text = None # A dead session raises again from page_source below
+            if page_text is None: # Only when the script failed; an empty body is classified as empty, not from raw <head> markup
+                source = driver.page_source; body_start = max(source.find('<body'), 0) # The <head> is mostly scripts and styles with no markers
+                page_text = source[body_start:body_start + PAGE_SOURCE_SCAN_LIMIT] # Bounded so the fallback doesn't lowercase a multi-MB DOM
+            classification, reason = self.classify_content(page_text.lower(), lower_url)
+            return LinkResult(link=url, status=classification, result_details=reason, final_url=final_url)
         except TimeoutException: return LinkResult(link=url, status=LinkStatus.ERROR, result_details=f"Page load timed out after {timeout}s.", error="TimeoutException")
         except WebDriverException as e:
-            err = str(e).lower()
-            status = LinkStatus.SESSION_LOST if any(s in err for s in ["no such window", "invalid session id", "target window already closed"]) else LinkStatus.ERROR
-            details = "Session lost." if status == LinkStatus.SESSION_LOST else f"WebDriver error: {str(e)[:100]}"
-            return LinkResult(link=url, status=status, result_details=details, error=str(e))
+            err = str(e)
+            if SESSION_DEAD_PATTERN.search(err): return LinkResult(link=url, status=LinkStatus.SESSION_LOST, result_details="Session lost.", error=err)
+            return LinkResult(link=url, status=LinkStatus.ERROR, result_details=f"WebDriver error: {err[:100]}", error=err)
         except Exception as e: return LinkResult(link=url, status=LinkStatus.ERROR, result_details="Unexpected analysis error", error=str(e))
 
     def worker_thread(self, worker_id: int):
         with self.lock: self.active_threads += 1
         main_logger.info(f"Worker {worker_id} started.")
+        self.should_stop.wait((worker_id - 1) * WORKER_START_STAGGER)
         while not self.should_stop.is_set():
             self.pause_event.wait();
             if self.links_queue.empty(): break
-            try: account = self.account_pool.get(timeout=1)
-            except queue.Empty:
+            account = self.account_pool.acquire(timeout=1.0) # Wakes as soon as an account comes free; the timeout only bounds Stop latency
+            if account is None:
                 if self.links_queue.empty(): break
-                main_logger.debug(f"Worker {worker_id} waiting for an account."); time.sleep(5); continue
-            if account.is_resting(self.settings.get('account_rest_duration_minutes', 30)):
-                self.account_pool.put(account); time.sleep(1); continue
-
-            driver, login_status = self.setup_and_login(account)
-            if login_status != LoginStatus.SUCCESS:
-                with self.lock: self.stats.login_failures += 1
-                if login_status == LoginStatus.FAIL_CAPTCHA: account.last_rate_limited_at = datetime.now()
-                self.account_pool.put(account)
-                if driver: driver.quit()
-                continue
-            
+                main_logger.debug("Worker %d waiting for an account.", worker_id); continue
+
+            try: self._run_account(worker_id, account)
+            except Exception as e: main_logger.error(f"Worker {worker_id} hit an unexpected error with {account.email}: {e}", exc_info=True)
+            finally: self.account_pool.release(account) # Always return the account, or it is lost for the rest of the run
+        with self.lock: self.active_threads -= 1
+        main_logger.info(f"Worker {worker_id} finished.")
+
+    def _run_account(self, worker_id: int, account: Account):
+        """Logs in as account and checks links with it until the queue empties, the session drops or the run stops."""
+        driver, login_status = self.setup_and_login(account)
+        if login_status != LoginStatus.SUCCESS:
+            with self.lock: self.stats.login_failures += 1
+            if login_status == LoginStatus.FAIL_CAPTCHA: account.last_rate_limited_at = datetime.now()
+            if driver: self.driver_pool.release(driver) # Cookies are wiped; only a dead browser gets quit
+            return
+        session_alive = True
+        try:
             while not self.should_stop.is_set():
                 self.pause_event.wait()
+                # The shared bucket can hand one worker tokens back to back; keep each account's own requests spaced out.
+                # Wait before taking a token, so other workers can use the bucket meanwhile.
+                spacing = self._account_last_hit.get(account.email, 0.0) + ACCOUNT_MIN_INTERVAL - time.monotonic()
+                if spacing > 0 and self.should_stop.wait(spacing): break
+                if not self._wait_for_rate_token(): break
                 try: url, line_num = self.links_queue.get_nowait()
                 except queue.Empty: break
-                with self.lock:
-                    total_links = len(self.processed_links_log) + self.links_queue.qsize() + 1
-                    current = self.stats.total_processed + 1
-                    max_threads = self.settings.get('num_threads')
-                if self.gui: self.gui.update_live_status(current, total_links, self.active_threads, max_threads)
-                main_logger.info(f"Processing Link {current}/{total_links}: {url} (Line {line_num}) with {account.email}")
-                result = self.analyze_link_page(driver, url)
+                current = next(self._link_counter); total_links = max(self._total_links, current) # Requeued links can push current past the total
+                if self.gui: self.gui.update_live_status(current, total_links, self.active_threads, self._num_threads)
+                main_logger.info("Processing Link %d/%d: %s (Line %s) with %s", current, total_links, url, line_num, account.email)
+                result = self.analyze_link_page(driver, url); self._account_last_hit[account.email] = time.monotonic()
                 result.account_email = account.email; result.line_num = line_num
-                if result.status == LinkStatus.SESSION_LOST: self.links_queue.put((url, line_num)); break
-                with self.lock:
-                    self.stats.total_processed += 1; self.results.append(result); self._log_processed_link(url)
-                    if result.status == LinkStatus.WORKING: self.stats.working_found += 1
-                    elif result.status == LinkStatus.RATE_LIMIT: self.stats.link_captcha_failures += 1
-                    elif result.status == LinkStatus.ERROR: self.stats.errors += 1
-                    else: self.stats.failed_or_invalid += 1
-                if self.gui: self.gui.update_stats_and_progress(self.stats)
-                time.sleep(random.uniform(self.settings.get('delay_min', 1.0), self.settings.get('delay_max', 3.0)))
-            if driver: driver.quit()
-            self.account_pool.put(account) # Return the account to the pool for another worker
-        with self.lock: self.active_threads -= 1
-        main_logger.info(f"Worker {worker_id} finished.")
+                if result.status == LinkStatus.SESSION_LOST: self.links_queue.put((url, line_num)); session_alive = False; break
+                self.results_queue.put(result)
+        finally:
+            # Keep a still-logged-in browser parked for this account; a lost session gets its cookies wiped (or quit if dead)
+            if session_alive: self.driver_pool.park(driver, account.email)
+            else: self.driver_pool.release(driver)
+
+    def _refill_rate_tokens(self):
+        num_threads, delay_min, delay_max = self._num_threads, self._delay_min, self._delay_max
+        while not self._rate_refill_stop.is_set():
+            try: self._rate_tokens.put_nowait(True)
+            except queue.Full: pass
+            self._rate_refill_stop.wait(random.uniform(delay_min, delay_max) / num_threads)
+    def _start_rate_refiller(self):
+        while True: # Start with a full bucket so every worker's first link goes out immediately, as before
+            try: self._rate_tokens.put_nowait(True)
+            except queue.Full: break
+        self._rate_refill_stop.clear()
+        self._rate_refiller = threading.Thread(target=self._refill_rate_tokens, name="RateLimiter", daemon=True); self._rate_refiller.start()
+    def _stop_rate_refiller(self):
+        if not self._rate_refiller: return
+        self._rate_refill_stop.set(); self._rate_refiller.join(); self._rate_refiller = None
+    def _wait_for_rate_token(self) -> bool:
+        while not self.should_stop.is_set():
+            try: self._rate_tokens.get(timeout=0.5); return True
+            except queue.Empty: continue
+        return False
+
+    def _record_result(self, result: LinkResult):
+        self.stats.total_processed += 1; self.results.append(result); self._log_processed_link(result.link)
+        field_name = STATUS_STAT_FIELDS.get(result.status, "failed_or_invalid"); setattr(self.stats, field_name, getattr(self.stats, field_name) + 1)
+        if result.status is LinkStatus.WORKING: heapq.heappush(self._working_heap, (result.link, len(self.results), result))
+    def _aggregate_results(self):
+        """Sole consumer of results_queue: owns the stats/results updates and rate-limits GUI refreshes. Stops on None."""
+        last_refresh = 0.0; dirty = False; stopping = False
+        while not stopping:
+            try:
+                result = self.results_queue.get(timeout=GUI_REFRESH_INTERVAL)
+                if result is None: stopping = True
+                else: self._record_result(result); dirty = True
+            except queue.Empty: pass
+            if dirty and self.gui and (stopping or time.monotonic() - last_refresh >= GUI_REFRESH_INTERVAL):
+                self.gui.update_stats_and_progress(self.stats); last_refresh = time.monotonic(); dirty = False
+    def _start_aggregator(self):
+        self._aggregator = threading.Thread(target=self._aggregate_results, name="ResultAggregator", daemon=True); self._aggregator.start()
+    def _stop_aggregator(self):
+        if not self._aggregator: return
+        self.results_queue.put(None); self._aggregator.join(); self._aggregator = None
 
     def run(self):
-        self.stats = Stats(); self.results.clear()
+        self.stats = Stats(); self.results.clear(); self._working_heap.clear(); self._link_counter = itertools.count(1)
         if STATE_FILE.exists(): STATE_FILE.unlink(); main_logger.info("New run started. Cleared old state file.")
-        total_links = self.read_and_queue_links()
+        total_links = self._total_links = self.read_and_queue_links()
         if self.gui: self.gui.set_total_links(total_links)
         if not total_links or self.account_pool.empty():
             msg = "No unique, unprocessed links found." if not total_links else "No accounts are configured."
@@ -460,12 +779,15 @@ class LinkedInChecker:
             if self.gui: self.gui.show_message_dialog("Input Error", msg, "error")
             if self.gui: self.gui.on_checking_finished(stopped=True)
             return
-        num_threads = self.settings.get('num_threads', 1)
-        with ThreadPoolExecutor(max_workers=num_threads, thread_name_prefix="LinkChecker") as executor:
-            futures = [executor.submit(self.worker_thread, i + 1) for i in range(num_threads)]
-            for future in as_completed(futures):
-                try: future.result()
-                except Exception as e: main_logger.error(f"Worker thread error: {e}", exc_info=True)
+        num_threads = self._num_threads
+        self.driver_pool.warm_up(); self._start_state_writer(); self._start_aggregator(); self._start_rate_refiller()
+        try:
+            with ThreadPoolExecutor(max_workers=num_threads, thread_name_prefix="LinkChecker") as executor:
+                futures = [executor.submit(self.worker_thread, i + 1) for i in range(num_threads)]
+                for future in as_completed(futures):
+                    try: future.result()
+                    except Exception as e: main_logger.error(f"Worker thread error: {e}", exc_info=True)
+        finally: self._stop_rate_refiller(); self.driver_pool.shutdown(); self._stop_aggregator(); self._stop_state_writer()
         self.stats.end_time = datetime.now(); main_logger.info("All worker threads have completed.")
         self.save_results()
         if self.gui: self.gui.on_checking_finished(stopped=self.should_stop.is_set())
@@ -474,18 +796,39 @@ class LinkedInChecker:
         if not self.results: return
         output_dir = Path(self.settings.get('output_dir', DEFAULT_OUTPUT_DIR)); output_dir.mkdir(parents=True, exist_ok=True)
         timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-        working_links = [r for r in self.results if r.status == LinkStatus.WORKING]
+        heap = list(self._working_heap); working_links = [heapq.heappop(heap)[-1] for _ in range(len(heap))]
+        # (path, text parts, log message); the parts are generators, so each record is serialized by the writer thread as it is written
+        jobs: List[Tuple[Path, Iterable[str], str]] = []
         if working_links:
             path = output_dir / f"working_links_{timestamp}.txt"
-            with path.open('w', encoding='utf-8') as f:
-                f.write(f"# LinkedIn Link Checker - Working Links\n# {datetime.now().isoformat()}\n\n")
-                for res in sorted(working_links, key=lambda r: r.link): f.write(f"{res.link} | {res.result_details}\n")
-            main_logger.info(f"Saved {len(working_links)} working links to: {path}")
+            header = f"# LinkedIn Link Checker - Working Links\n# {datetime.now().isoformat()}\n\n"
+            parts = itertools.chain((header,), (f"{res.link} | {res.result_details}\n" for res in working_links))
+            jobs.append((path, parts, f"Saved {len(working_links)} working links to: {path}"))
         path = output_dir / f"detailed_results_{timestamp}.json"
-        with path.open('w', encoding='utf-8') as f:
-            serializable_results = [asdict(r, dict_factory=lambda data: {k: v.value if isinstance(v, Enum) else v for k, v in data}) for r in self.results]
-            json.dump({"summary": asdict(self.stats), "results": serializable_results}, f, indent=4, default=str)
-        main_logger.info(f"Saved detailed JSON results to: {path}")
+        parts = self._detailed_json_parts(dict(self.stats.__dict__), list(self.results)) # Snapshots only; nothing is serialized yet
+        jobs.append((path, parts, f"Saved detailed JSON results to: {path}"))
+        # Not a daemon: the finish dialog doesn't wait on the disk, but closing the app still lets the files complete
+        self._results_writer = threading.Thread(target=self._write_result_files, args=(jobs,), name="ResultsWriter"); self._results_writer.start()
+
+    @staticmethod
+    def _to_json(data: Dict[str, Any]) -> str:
+        # orjson when available; otherwise json.dumps without indent, which still uses the C encoder (json.dump/indent do not)
+        if ORJSON_AVAILABLE: return orjson.dumps(data, default=str).decode('utf-8')
+        return json.dumps(data, default=lambda o: o.isoformat() if isinstance(o, datetime) else str(o)) # ISO datetimes, as orjson writes them
+    @classmethod
+    def _detailed_json_parts(cls, summary: Dict[str, Any], results: List[LinkResult]) -> Iterator[str]:
+        # One record per line, compact. The dataclasses are flat, so a shallow copy of __dict__ replaces asdict's recursive deepcopy walk.
+        to_json = cls._to_json
+        yield '{"summary": ' + to_json(summary) + ',\n"results": ['
+        for i, r in enumerate(results): yield (",\n" if i else "\n") + to_json({**r.__dict__, 'status': r.status.value})
+        yield "\n]}\n"
+    @staticmethod
+    def _write_result_files(jobs: List[Tuple[Path, Iterable[str], str]]):
+        for path, parts, message in jobs:
+            try:
+                with path.open('w', encoding='utf-8', buffering=1 << 20) as f: f.writelines(parts) # Streams through the buffer; only one record is in memory at a time
+                main_logger.info(message)
+            except IOError as e: main_logger.error(f"Failed to write results to {path}: {e}")
 
     def stop(self): self.should_stop.set(); self.pause_event.set()
     def pause(self): self.pause_event.clear(); self.is_paused = True
@@ -498,12 +841,22 @@ class LinkedInCheckerGUI:
         if not GUI_AVAILABLE: raise RuntimeError("GUI libraries not installed.")
         self.config_manager = ConfigManager(CONFIG_FILE, DEFAULT_CONFIG)
         self.app_config = self.config_manager.load_config()
-        self.root = ctk.CTk(); self.log_queue = queue.Queue(); self.captcha_response_queue = queue.Queue()
+        self.root = ctk.CTk(); self.log_queue = NotifyingQueue(maxsize=LOG_QUEUE_MAX)
         global main_logger; main_logger = setup_logging(log_queue=self.log_queue)
         ctk.set_appearance_mode(self.app_config.get("settings", {}).get("theme", "dark"))
         ctk.set_default_color_theme(self.app_config.get("settings", {}).get("color_theme", "blue"))
         self.checker: Optional[LinkedInChecker] = None; self.checker_thread: Optional[threading.Thread] = None
         self.is_running = False; self.total_links = 0
+        # Latest status/stats posted by worker threads; versions tell the flusher whether anything changed since its last redraw
+        self._pending_status = ""; self._status_version = 0; self._drawn_status_version = 0; self._status_text = "Status: Ready"
+        self._pending_stats: Optional[Stats] = None; self._stats_version = 0; self._drawn_stats_version = 0
+        self._flush_scheduled = False # True while a redraw is queued on the Tk loop
+        self._ui_thread_id = threading.get_ident() # The Tk thread; see _on_ui
+        self._parsed_accounts: List[Tuple[str, str]] = []
+        self._last_stats_vals: Dict[str, int] = {key: -1 for key, _, _ in STATS_LABEL_FIELDS} # Count each stats label currently shows, to skip no-op configure() calls
+        self._last_progress_q = -1 # Progress bar position last drawn, in thousandths
+        self._log_line_count = 0 # Lines currently in the log textbox, tracked here instead of asking Tk
+        self._log_drain_scheduled = False # True while a log drain is queued on the Tk loop
         self._setup_ui()
         self.load_settings_to_ui()
         self._start_log_processor()
@@ -561,14 +914,19 @@ class LinkedInCheckerGUI:
     def load_accounts_from_file(self):
         file_path = filedialog.askopenfilename(title="Select Accounts File", filetypes=[("Text Files", "*.txt"), ("All files", "*.*")])
         if not file_path: return
+        # Read off the Tk thread so a slow or network drive can't freeze the window; widgets are only touched back on it
+        threading.Thread(target=self._read_accounts_file, args=(file_path,), name="AccountsReader", daemon=True).start()
+    def _read_accounts_file(self, file_path: str):
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                accounts_text = f.read()
-            self.accounts_textbox.delete("1.0", tk.END)
-            self.accounts_textbox.insert("1.0", accounts_text)
-            main_logger.info(f"Loaded {len(accounts_text.splitlines())} accounts from {file_path}")
+            accounts_text = Path(file_path).read_text(encoding='utf-8')
         except Exception as e:
-            self.show_message_dialog("Error Reading File", f"Could not read the accounts file.\nError: {e}", "error")
+            self.root.after(0, self.show_message_dialog, "Error Reading File", f"Could not read the accounts file.\nError: {e}", "error"); return
+        self.root.after(0, self._apply_accounts_text, accounts_text, file_path)
+    def _apply_accounts_text(self, accounts_text: str, file_path: str):
+        self.accounts_textbox.delete("1.0", tk.END)
+        self.accounts_textbox.insert("1.0", accounts_text)
+        line_count = accounts_text.count('\n') + (not accounts_text.endswith('\n')) if accounts_text else 0 # Counts '\n'-terminated lines without building a list of them
+        main_logger.info(f"Loaded {line_count} accounts from {file_path}")
 
     def _create_settings_tab(self, parent):
         parent.grid_columnconfigure(1, weight=1)
@@ -601,7 +959,8 @@ class LinkedInCheckerGUI:
         self.stop_btn = ctk.CTkButton(frame, text="Stop", command=self.stop_checking, height=35, state="disabled", fg_color="#C62828", hover_color="#B71C1C")
         self.stop_btn.grid(row=0, column=2, rowspan=2, padx=5, pady=5, sticky="ns")
         
-        self.status_label = ctk.CTkLabel(frame, text="Status: Ready", anchor="w"); self.status_label.grid(row=0, column=3, padx=10, sticky="sew")
+        self.status_var = ctk.StringVar(value="Status: Ready") # Bound to the label; update_status sets it only when the text changes
+        self.status_label = ctk.CTkLabel(frame, textvariable=self.status_var, anchor="w"); self.status_label.grid(row=0, column=3, padx=10, sticky="sew")
         self.progress_bar = ctk.CTkProgressBar(frame); self.progress_bar.set(0); self.progress_bar.grid(row=1, column=3, padx=10, pady=(0,5), sticky="new")
         
         stats_frame = ctk.CTkFrame(frame, fg_color="transparent"); stats_frame.grid(row=0, column=4, rowspan=2, padx=10, pady=5, sticky="e")
@@ -640,9 +999,17 @@ class LinkedInCheckerGUI:
             self.config_manager.save_config(self.app_config)
         except (ValueError, TclError) as e: main_logger.warning(f"Could not save UI to config: {e}")
 
+    @staticmethod
+    def _parse_accounts(accounts_text: str) -> List[Tuple[str, str]]:
+        """Parses email:password lines in one pass; lines without a colon are skipped."""
+        parsed = []
+        for line in accounts_text.splitlines():
+            email, sep, password = line.strip().partition(':')
+            if sep: parsed.append((email, password))
+        return parsed
     def validate_inputs(self) -> bool:
-        accounts = [line.strip() for line in self.accounts_textbox.get("1.0", tk.END).strip().splitlines() if line.strip() and ':' in line]
-        if not accounts: self.show_message_dialog("Input Error", "Please provide at least one account in email:password format.", "error"); return False
+        self._parsed_accounts = self._parse_accounts(self.accounts_textbox.get("1.0", tk.END)) # Reused by start_checking
+        if not self._parsed_accounts: self.show_message_dialog("Input Error", "Please provide at least one account in email:password format.", "error"); return False
         if not Path(self.input_file_entry.get()).is_file(): self.show_message_dialog("Input Error", "Please select a valid input file.", "error"); return False
         try: float(self.delay_min_entry.get()); float(self.delay_max_entry.get())
         except ValueError: self.show_message_dialog("Input Error", "Delay values must be valid numbers.", "error"); return False
@@ -662,24 +1029,24 @@ class LinkedInCheckerGUI:
         if not self.validate_inputs(): return
         self.is_running = True; self._set_ui_state(True)
         
-        accounts_text = self.app_config.get('accounts_text', '')
-        accounts_data = [line.strip().split(":", 1) for line in accounts_text.splitlines() if line.strip() and ':' in line]
-        accounts = [Account(email=e, password=p) for e, p in accounts_data]
+        accounts = [Account(email=e, password=p) for e, p in self._parsed_accounts]
 
         self.checker = LinkedInChecker(self.app_config, accounts, self)
-        self.update_status("Status: Starting..."); self.progress_bar.set(0); self.update_stats(Stats())
+        self.update_status("Status: Starting..."); self.progress_bar.set(0); self._last_progress_q = 0; self.update_stats(Stats())
         self.checker_thread = threading.Thread(target=self.checker.run, name="MainChecker", daemon=True)
         self.checker_thread.start()
 
     def on_checking_finished(self, stopped: bool = False):
         self.is_running = False; self._set_ui_state(False)
-        if stopped: self.status_label.configure(text="Status: Stopped by user.")
+        self._drawn_status_version = self._status_version # Don't let a queued "Processing..." overwrite the final status
+        if stopped: self.update_status("Status: Stopped by user.")
         else:
-            self.status_label.configure(text="Status: Completed")
+            self.update_status("Status: Completed")
             if self.checker:
-                 msg = (f"Finished checking links.\n\nProcessed: {self.checker.stats.total_processed}\nWorking Links: {self.checker.stats.working_found}\n"
-                       f"Failed/Invalid: {self.checker.stats.failed_or_invalid}\nRate Limited: {self.checker.stats.link_captcha_failures}\n"
-                       f"Login Fails: {self.checker.stats.login_failures}\nErrors: {self.checker.stats.errors}")
+                 s = self.checker.stats
+                 msg = (f"Finished checking links.\n\nProcessed: {s.total_processed}\nWorking Links: {s.working_found}\n"
+                       f"Failed/Invalid: {s.failed_or_invalid}\nRate Limited: {s.link_captcha_failures}\n"
+                       f"Login Fails: {s.login_failures}\nErrors: {s.errors}")
                  self.show_message_dialog("Checking Complete", msg)
 
     def toggle_pause_resume(self):
@@ -700,43 +1067,71 @@ class LinkedInCheckerGUI:
 
     def set_total_links(self, total: int): self.total_links = total
     def update_live_status(self, current: int, total: int, active: int, max_threads: int):
-        self.root.after(0, self.update_status, f"Status: Processing {current}/{total} | Threads: {active}/{max_threads}")
-    def update_stats_and_progress(self, stats: Stats): self.root.after(0, self.update_stats, stats)
+        self._pending_status = f"Status: Processing {current}/{total} | Threads: {active}/{max_threads}"; self._status_version += 1; self._schedule_flush()
+    def update_stats_and_progress(self, stats: Stats): self._pending_stats = stats; self._stats_version += 1; self._schedule_flush()
+    def _schedule_flush(self):
+        # At most one redraw is queued however many updates arrive, and nothing is scheduled while the GUI is idle
+        if self._flush_scheduled: return
+        self._flush_scheduled = True; self.root.after(GUI_FLUSH_INTERVAL_MS, self._flush_pending)
+    def _flush_pending(self):
+        self._flush_scheduled = False # Cleared before reading, so an update that lands mid-redraw schedules the next one
+        if self._status_version != self._drawn_status_version:
+            self._drawn_status_version = self._status_version; self.update_status(self._pending_status)
+        if self._stats_version != self._drawn_stats_version and self._pending_stats:
+            self._drawn_stats_version = self._stats_version; self.update_stats(self._pending_stats)
     
-    def update_status(self, text: str): self.status_label.configure(text=text)
+    def update_status(self, text: str):
+        if text != self._status_text: self._status_text = text; self.status_var.set(text)
     def update_stats(self, stats: Stats):
-        self.stats_labels['processed'].configure(text=f"Processed: {stats.total_processed}")
-        self.stats_labels['working'].configure(text=f"Working: {stats.working_found}")
-        self.stats_labels['failed'].configure(text=f"Failed: {stats.failed_or_invalid}")
-        self.stats_labels['rate_limit'].configure(text=f"Rate Limit: {stats.link_captcha_failures}")
-        self.stats_labels['login_fails'].configure(text=f"Login Fails: {stats.login_failures}")
-        self.stats_labels['errors'].configure(text=f"Errors: {stats.errors}")
-        if self.total_links > 0: self.progress_bar.set(stats.total_processed / self.total_links)
-
-    def show_captcha_prompt(self, email: str) -> bool:
-        self.root.after(0, self._ask_captcha_question, email)
-        return self.captcha_response_queue.get()
-    def _ask_captcha_question(self, email: str):
+        last = self._last_stats_vals
+        for key, caption, field_name in STATS_LABEL_FIELDS:
+            value = getattr(stats, field_name)
+            if last[key] != value: last[key] = value; self.stats_labels[key].configure(text=f"{caption}: {value}") # Text is built only for changed counts
+        if self.total_links > 0:
+            progress_q = stats.total_processed * 1000 // self.total_links # Integer thousandths; the bar redraws only when this moves
+            if progress_q != self._last_progress_q: self._last_progress_q = progress_q; self.progress_bar.set(progress_q / 1000)
+
+    def _on_ui(self, fn: Callable[..., Any], *args: Any):
+        """Runs fn on the Tk thread: directly when already there, otherwise via root.after."""
+        if threading.get_ident() == self._ui_thread_id: fn(*args)
+        else: self.root.after(0, fn, *args)
+    def show_captcha_prompt(self, email: str) -> "Future[bool]":
+        """Asks the user to solve a security check; the returned Future resolves to their answer."""
+        answer: "Future[bool]" = Future(); self._on_ui(self._ask_captcha_question, email, answer); return answer
+    def _ask_captcha_question(self, email: str, answer: "Future[bool]"):
         msg = (f"A security check (e.g., CAPTCHA) was detected for {email}.\nPlease solve it in the browser window.\n\nClick 'Yes' once logged in, or 'No' to skip.");
-        result = messagebox.askyesno("Manual Action Required", msg)
-        self.captcha_response_queue.put(result)
+        answer.set_result(messagebox.askyesno("Manual Action Required", msg)) # Each prompt owns its Future, so concurrent prompts can't swap answers
 
     def show_message_dialog(self, title: str, message: str, msg_type: str = "info"):
         def _show():
             if msg_type == "error": messagebox.showerror(title, message)
             elif msg_type == "warning": messagebox.showwarning(title, message)
             else: messagebox.showinfo(title, message)
-        self.root.after(0, _show)
+        self._on_ui(_show)
 
     def _start_log_processor(self):
-        def process():
-            try:
-                self.log_textbox.configure(state="normal")
-                while True: self.log_textbox.insert(tk.END, self.log_queue.get_nowait() + "\n")
-            except queue.Empty: pass
-            finally: self.log_textbox.see(tk.END); self.log_textbox.configure(state="disabled")
-            self.root.after(250, process)
-        self.root.after(100, process)
+        self.log_queue.on_put = self._schedule_log_drain # New lines schedule their own drain; no steady polling
+        def watchdog(): self._drain_logs(); self.root.after(LOG_WATCHDOG_MS, watchdog)
+        self.root.after(100, watchdog)
+    def _schedule_log_drain(self):
+        # Runs on whichever thread logged; at most one drain is queued at a time
+        if self._log_drain_scheduled: return
+        self._log_drain_scheduled = True
+        try: self.root.after(LOG_DRAIN_DELAY_MS, self._drain_logs)
+        except (RuntimeError, TclError): self._log_drain_scheduled = False # Window is being torn down
+    def _drain_logs(self):
+        self._log_drain_scheduled = False # Cleared before draining, so a line that lands mid-drain schedules the next one
+        lines = []
+        try:
+            while True: lines.append(self.log_queue.get_nowait())
+        except queue.Empty: pass
+        if not lines: return
+        # One insert per drain instead of one Tk call (and re-layout) per message
+        text = "\n".join(lines) + "\n"; self._log_line_count += text.count("\n") # Tracebacks span several lines
+        box = self.log_textbox; box.configure(state="normal"); box.insert(tk.END, text)
+        if self._log_line_count > LOG_MAX_LINES:
+            box.delete('1.0', f'{self._log_line_count - LOG_TRIM_TO_LINES + 1}.0'); self._log_line_count = LOG_TRIM_TO_LINES
+        box.see(tk.END); box.configure(state="disabled")
 
     def run(self): self.root.mainloop()
 
@@ -749,6 +1144,7 @@ def check_prerequisites():
     if not GUI_AVAILABLE: missing.append("customtkinter Pillow") # Added Pillow
     if not UNDETECTED_CHROME_AVAILABLE: print("Warning: 'undetected-chromedriver' not found. Stealth may be reduced. (pip install undetected-chromedriver)")
     if not SELENIUM_STEALTH_AVAILABLE: print("Warning: 'selenium-stealth' not found. Stealth may be reduced. (pip install selenium-stealth)")
+    if not ORJSON_AVAILABLE: print("Warning: 'orjson' not found. Falling back to the slower built-in json module. (pip install orjson)")
     if missing:
         msg = f"ERROR: Missing critical libraries. Please run:\n\npip install {' '.join(missing)}"
         print(msg)
@@ -0,0 +1,73 @@
+# translations_ar.py
+# Arabic strings; translations.set_language imports this module only when "ar" is selected
+DATA = {
+    "app_title": "LinkURL - مدقق الروابط",
+    "tab_accounts_and_files": "الحسابات والملفات",
+    "tab_settings": "الإعدادات",
+    "email_label": "الحسابات (البريد الإلكتروني:كلمة المرور، واحد لكل سطر):",
+    "input_file_label": "ملف الروابط:",
+    "output_dir_label": "مجلد الإخراج:",
+    "browse_button": "تصفح...",
+    "browser_label": "المتصفح:",
+    "headless_mode_checkbox": "الوضع الخفي",
+    "delay_label": "التأخير (ثانية):",
+    "threads_label": "عدد المسارات:",
+    "delay_to_label": "إلى",
+    "start_button": "بدء الفحص",
+    "pause_button": "إيقاف مؤقت",
+    "resume_button": "استئناف",
+    "stop_button": "إيقاف",
+    "status_ready": "الحالة: جاهز",
+    "status_starting": "الحالة: جار البدء...",
+    "status_processing_link": "الحالة: معالجة الرابط {current}/{total} | المسارات: {active_threads}",
+    "status_paused": "الحالة: متوقف مؤقتاً",
+    "status_resuming": "الحالة: جار الاستئناف...",
+    "status_stopping": "الحالة: جار الإيقاف...",
+    "status_completed": "الحالة: اكتمل",
+    "security_challenge_message": "تم اكتشاف تحقق أمني (مثل الكابتشا) للحساب {email}.\n\nالرجاء حله في نافذة المتصفح.\n\nانقر 'نعم' بمجرد الانتهاء، أو 'لا' لتخطي هذا الحساب.",
+    "status_generated_on": "تم إنشاؤه في: {date}",
+    "total_found_label": "إجمالي ما تم العثور عليه: {count}",
+    "confidence_label": "الثقة: {confidence}",
+    "stats_processed_prefix": "المعالج",
+    "stats_working_prefix": "يعمل",
+    "stats_failed_prefix": "فشل",
+    "stats_rl_account_prefix": "مقيد (حساب)",
+    "stats_errors_prefix": "أخطاء",
+    "log_section_title": "السجل المباشر",
+    "settings_language_label": "اللغة:",
+    "headless_note_label": "ملاحظة: قم بتعطيل الوضع الخفي لحل اختبارات تسجيل الدخول الأمنية.",
+    "confirm_exit_title": "تأكيد الخروج",
+    "confirm_exit_message": "الفاحص قيد التشغيل. هل أنت متأكد من أنك تريد الإيقاف والخروج؟",
+    "error_dialog_title": "خطأ في الإدخال",
+    "missing_email_password_error": "الرجاء تقديم حساب واحد على الأقل بالتنسيق 'email:password'.",
+    "missing_input_file_error": "الرجاء تحديد ملف إدخال.",
+    "invalid_delay_error": "يجب أن تكون قيم التأخير أرقامًا صالحة.",
+    "security_challenge_title": "إجراء يدوي مطلوب",
+    "security_challenge_detected_log": "تم اكتشاف تحدٍ أمني لـ {email}. يتم الإيقاف المؤقت للتدخل اليدوي.",
+    "security_challenge_solved_log": "يبدو أنه تم حل التحدي الأمني لـ {email}. جار الاستئناف.",
+    "security_challenge_failed_log": "تخطى المستخدم أو فشل في حل التحدي الأمني لـ {email}.",
+    "checking_complete_dialog_title": "اكتمل الفحص",
+    "checking_complete_dialog_message": "انتهى فحص الروابط.\n\nالمعالج: {total_processed}\nالروابط العاملة: {working_found}\nالفاشلة/غير صالحة: {failed_or_invalid}\nمقيد (حساب حالي): {rate_limit_suspected_current_account}\nالأخطاء: {errors}",
+    "login_failed_all_accounts_title": "فشل تسجيل الدخول",
+    "login_failed_all_accounts_message": "تعذر تسجيل الدخول إلى أي من حسابات LinkedIn المقدمة. يرجى التحقق من بيانات الاعتماد واتصالك بالإنترنت.",
+    "all_accounts_resting_warning": "جميع الحسابات مقيدة حاليًا وفي فترة راحة. يرجى الانتظار قبل المحاولة مرة أخرى.",
+    "no_accounts_configured_error": "لم يتم تكوين أي حسابات. الرجاء إضافة حسابات في الإعدادات.",
+    "no_links_to_process_error": "لم يتم العثور على روابط للمعالجة في ملف الإدخال.",
+    "processing_link_info": "معالجة الرابط {link_index}/{total_links}: {url} (من السطر {line_num}) باستخدام {email}",
+    "rate_limit_detected_details": "تم اكتشاف تقييد للمعدل / CAPTCHA.",
+    "redirected_to_login_details": "تمت إعادة التوجيه إلى صفحة تسجيل الدخول/الجدار المصادقة.",
+    "redirected_to_feed_details": "تمت إعادة التوجيه إلى الصفحة الرئيسية؛ الرابط على الأرجح غير صالح.",
+    "offer_unavailable_details": "انتهت صلاحية العرض، أو غير متوفر، أو تم استرداده بالفعل.",
+    "already_premium_details": "الحساب عضو بريميوم بالفعل.",
+    "trial_gift_found_details": "تم العثور على عرض تجريبي/هدية محتمل.",
+    "no_clear_trial_indicators_details": "لم يتم العثور على مؤشرات واضحة للنسخة التجريبية، قد يكون الرابط غير صالح.",
+    "page_load_timeout_error": "انتهت مهلة تحميل الصفحة.",
+    "webdriver_error_details": "خطأ في WebDriver: {error}",
+    "saved_working_links_info": "تم حفظ {count} من الروابط العاملة في: {file_path}",
+    "saved_detailed_results_info": "تم حفظ النتائج التفصيلية JSON في: {file_path}",
+    "language_restart_title": "إعادة التشغيل مطلوبة",
+    "language_restart_message": "تم تغيير اللغة. سيتم الآن إعادة تشغيل التطبيق لتطبيق التغييرات.",
+    "input_file_not_found_error": "ملف الإدخال غير موجود: {file_path}",
+    "found_links_to_process_info": "{count} روابط للمعالجة.",
+    "error_reading_links_error": "خطأ في قراءة الروابط: {error}",
+}